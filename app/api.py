@@ -53,9 +53,10 @@ async def trigger_daily_scrape(tasks: BackgroundTasks):
 )
 async def trigger_race_scrape(race_id: int, tasks: BackgroundTasks):
     with Session(engine) as s:
-        if not s.get(Race, race_id):
+        race = s.get(Race, race_id)
+        if not race:
             raise HTTPException(status_code=404, detail="Race not found")
-    tasks.add_task(run_race_scrape, race_id)
+    tasks.add_task(run_race_scrape, race_id, race.url, race.unibet_id)
     return {"message": f"Race {race_id} scrape scheduled"}
 
 
@@ -9,6 +9,8 @@ class Settings:
     DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite:///./data.sqlite")
     TZ: str = os.getenv("TZ", "Europe/Paris")
     SHOW_BROWSER: bool = os.getenv("SHOW_BROWSER", "1") == "1"
+    # Attach to an already-running Chrome (--remote-debugging-port) instead of launching one
+    PW_CDP_URL: str = os.getenv("PW_CDP_URL", "")
     
     # Git automation settings
     GIT_AUTO_COMMIT: bool = os.getenv("GIT_AUTO_COMMIT", "false").lower() == "true"
@@ -11,6 +11,7 @@ from sqlmodel import Session, select, delete
 from app.db import engine
 from app.models import Race, RaceDetail, ScrapeLog
 from app.scrapers.daily import run_daily_scrape, reschedule_jobs
+from app.scrapers.browser_pool import close_browser_pool
 from app.scheduler import scheduler
 from app.scheduler_refresh import setup_hourly_refresh, trigger_manual_refresh
 from app.git_operations import daily_git_commit  # NEW
@@ -175,6 +176,9 @@ async def _stop_scheduler():
     scheduler.shutdown(wait=False)
     logger.info("Scheduler shutdown")
 
+    await close_browser_pool()
+    logger.info("Browser pool closed")
+
 
 def _run_daily_in_thread():
     asyncio.run(run_daily_scrape())
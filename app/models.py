@@ -20,7 +20,7 @@ class RaceDetail(SQLModel, table=True):
 
     bookmarklet_json: Dict[str, Any] = Field(sa_column=Column(SAJSON))
     prediction_request: Optional[Dict[str, Any]] = Field(default=None, sa_column=Column(SAJSON))
-    prediction_response: Optional[str] = None
+    prediction_response: Optional[Dict[str, Any]] = Field(default=None, sa_column=Column(SAJSON))
     betting_request: Optional[Dict[str, Any]] = Field(default=None, sa_column=Column(SAJSON))
     race_url: Optional[str] = None
 
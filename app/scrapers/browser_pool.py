@@ -0,0 +1,188 @@
+# app/scrapers/browser_pool.py
+
+import asyncio
+import logging
+import os
+import time
+import weakref
+from typing import Dict, List, Optional
+
+from playwright.async_api import async_playwright, Browser, BrowserContext, Playwright
+
+from app.config import get_settings
+
+log = logging.getLogger(__name__)
+
+# Chromium subsystems a headless scraper never uses
+LAUNCH_ARGS = [
+    "--disable-gpu",
+    "--disable-extensions",
+    "--disable-background-networking",
+    "--disable-sync",
+    "--disable-translate",
+    "--mute-audio",
+    "--no-first-run",
+]
+# Containers typically lack the user namespaces for the sandbox and have a tiny /dev/shm
+CONTAINER_LAUNCH_ARGS = ["--no-sandbox", "--disable-dev-shm-usage"]
+
+
+def launch_args() -> List[str]:
+    """Chromium flags for scraping, plus the container-only ones when running in a container."""
+    if os.getenv("IN_CONTAINER") or os.path.exists("/.dockerenv"):
+        return LAUNCH_ARGS + CONTAINER_LAUNCH_ARGS
+    return list(LAUNCH_ARGS)
+
+
+class _PooledBrowser:
+    """A pooled browser plus the bookkeeping used to decide when to retire it."""
+
+    def __init__(self, browser: Browser):
+        self.browser = browser
+        self.launched_at = time.monotonic()
+        self.uses = 0
+        self.active = 0
+
+
+class BrowserPool:
+    """
+    Keep up to max_size headless Chromium processes alive and hand out a fresh
+    BrowserContext per scrape, so the browser cold start is paid once instead
+    of per race.
+
+    A browser is retired after max_uses contexts or max_age_ms, whichever
+    comes first, and closed once its last context is released. This bounds
+    the memory Playwright accumulates in a long-lived browser.
+
+    When cdp_url is set, connect to an already-running Chrome over CDP
+    instead of launching one; closing a pooled browser then only disconnects.
+    """
+
+    def __init__(
+        self,
+        headless: bool = True,
+        cdp_url: Optional[str] = None,
+        max_size: int = 3,
+        max_uses: int = 50,
+        max_age_ms: int = 600_000,
+    ):
+        self.headless = headless
+        self.cdp_url = cdp_url
+        self.max_size = max_size
+        self.max_uses = max_uses
+        self.max_age_ms = max_age_ms
+        self._playwright: Optional[Playwright] = None
+        self._browsers: List[_PooledBrowser] = []
+        # Retired browsers that still have contexts out; closed on their last release()
+        self._retiring: List[_PooledBrowser] = []
+        self._owners: Dict[BrowserContext, _PooledBrowser] = {}
+        self._lock = asyncio.Lock()
+
+    def _is_expired(self, pooled: _PooledBrowser) -> bool:
+        age_ms = (time.monotonic() - pooled.launched_at) * 1000
+        return (
+            pooled.uses >= self.max_uses
+            or age_ms >= self.max_age_ms
+            or not pooled.browser.is_connected()
+        )
+
+    async def _launch(self) -> _PooledBrowser:
+        if self._playwright is None:
+            self._playwright = await async_playwright().start()
+        if self.cdp_url:
+            log.debug("Connecting browser pool to %s over CDP", self.cdp_url)
+            browser = await self._playwright.chromium.connect_over_cdp(self.cdp_url)
+        else:
+            log.debug("Launching headless Chromium for the browser pool (%d/%d)", len(self._browsers) + 1, self.max_size)
+            browser = await self._playwright.chromium.launch(headless=self.headless, args=launch_args())
+        pooled = _PooledBrowser(browser)
+        self._browsers.append(pooled)
+        return pooled
+
+    async def _close_browser(self, pooled: _PooledBrowser) -> None:
+        try:
+            await pooled.browser.close()
+        except Exception as e:
+            log.warning("Failed to close pooled browser: %s", e)
+
+    async def _retire_expired(self) -> None:
+        for pooled in [b for b in self._browsers if self._is_expired(b)]:
+            self._browsers.remove(pooled)
+            log.debug("Retiring pooled browser after %d uses", pooled.uses)
+            if pooled.active:
+                self._retiring.append(pooled)
+            else:
+                await self._close_browser(pooled)
+
+    async def _checkout(self) -> _PooledBrowser:
+        async with self._lock:
+            await self._retire_expired()
+            idle = [b for b in self._browsers if not b.active]
+            if idle:
+                pooled = idle[0]
+            elif len(self._browsers) < self.max_size:
+                pooled = await self._launch()
+            else:
+                # Pool is full and busy: share the least loaded browser
+                pooled = min(self._browsers, key=lambda b: b.active)
+            pooled.uses += 1
+            pooled.active += 1
+            return pooled
+
+    async def acquire(self, **context_kwargs) -> BrowserContext:
+        """Open a new context on one of the pooled browsers. Pair with release()."""
+        pooled = await self._checkout()
+        try:
+            context = await pooled.browser.new_context(**context_kwargs)
+        except Exception:
+            pooled.active -= 1
+            raise
+        self._owners[context] = pooled
+        return context
+
+    async def release(self, context: BrowserContext) -> None:
+        """Close a context handed out by acquire()."""
+        try:
+            await context.close()
+        except Exception as e:
+            log.warning("Failed to close browser context: %s", e)
+
+        pooled = self._owners.pop(context, None)
+        if pooled is None:
+            return
+        pooled.active -= 1
+        if pooled.active == 0 and pooled in self._retiring:
+            self._retiring.remove(pooled)
+            await self._close_browser(pooled)
+
+    async def close(self) -> None:
+        """Shut down every pooled browser and the Playwright driver."""
+        async with self._lock:
+            for pooled in self._browsers + self._retiring:
+                await self._close_browser(pooled)
+            self._browsers.clear()
+            self._retiring.clear()
+            self._owners.clear()
+            if self._playwright is not None:
+                await self._playwright.stop()
+                self._playwright = None
+
+
+# Playwright objects are bound to the event loop that created them, so keep one pool per loop
+_pools: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, BrowserPool]" = weakref.WeakKeyDictionary()
+
+
+def get_browser_pool() -> BrowserPool:
+    """Return the browser pool for the running event loop, creating it on first use."""
+    loop = asyncio.get_running_loop()
+    pool = _pools.get(loop)
+    if pool is None:
+        pool = _pools[loop] = BrowserPool(cdp_url=get_settings().PW_CDP_URL or None)
+    return pool
+
+
+async def close_browser_pool() -> None:
+    """Close the running loop's browser pool, if one was started."""
+    pool = _pools.pop(asyncio.get_running_loop(), None)
+    if pool is not None:
+        await pool.close()
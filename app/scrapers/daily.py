@@ -15,6 +15,7 @@ from sqlmodel import Session, select
 from app.config import get_settings
 from app.db import engine
 from app.models import Race, ScrapeLog
+from app.scrapers.browser_pool import launch_args
 from app.scrapers.race import run_race_scrape
 from app.scheduler import scheduler  # ⬅️ added
 
@@ -130,7 +131,7 @@ def schedule_race(race: Race) -> None:
         run_race_scrape,
         trigger="date",
         run_date=run_time_utc,
-        args=[race.id],
+        args=[race.id, race.url, race.unibet_id],
         id=job_id,
         replace_existing=True,
         misfire_grace_time=60,
@@ -154,7 +155,7 @@ async def run_daily_scrape() -> None:
     logger.info("→ daily scrape starting")
 
     async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=not settings.SHOW_BROWSER)
+        browser = await p.chromium.launch(headless=not settings.SHOW_BROWSER, args=launch_args())
         try:
             page = await browser.new_page(ignore_https_errors=True)
             logger.info("Opening programme page…")
@@ -8,14 +8,21 @@ import json
 import pprint
 import csv
 import os
+import queue
+import threading
+import time
+import atexit
+from collections import Counter
 from datetime import datetime
 from pathlib import Path
 
-from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeoutError
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
 from sqlmodel import Session, select
 
 from app.db import engine
 from app.models import Race, RaceDetail
+from app.scrapers.browser_pool import get_browser_pool, close_browser_pool
+from app.scrapers.runners_js import RUNNERS_INIT_SCRIPT, block_heavy_resources, load_and_extract
 
 # ─── configure logging ──────────────────────────────────────────────────────────
 logging.basicConfig(
@@ -28,13 +35,33 @@ PREDICT_URL = (
     "http://127.0.0.1:8080/predict"
 )
 
+PREDICT_BATCH_URL = PREDICT_URL + "/batch"
+
 FORWARD_URL = "http://127.0.0.1:5173/place-bets"
 
 # CSV file paths (in project root)
 CSV_FILE_PATH = Path(__file__).parent.parent.parent / "race_data_log.csv"
 RUNNERS_CSV_PATH = Path(__file__).parent.parent.parent / "race_runners_log.csv"
-
-def save_to_csv(race_id: int, data_type: str, data: dict, timestamp: str):
+RACES_CSV_PATH = Path(__file__).parent.parent.parent / "race_info_log.csv"
+CSV_LOG_HEADERS = ('timestamp', 'race_id', 'data_type', 'data_json')
+# One row per scraped race, and one per runner linked back to it by Race_ID
+# (older files with per-runner race columns are converted by migrate_csv_logs.py)
+RACES_CSV_HEADERS = ['Race_ID', 'Title', 'Meta', 'Track', 'Scraped_At']
+RUNNERS_CSV_HEADERS = [
+    'Race_ID', 'Place', 'Number', 'Horse_Name',
+    'Jockey', 'Age_Sex', 'Equipment', 'Weight', 'Times',
+    'Odds_Morning', 'Odds_Live', 'Trainer', 'Distance', 'Musique'
+]
+# Result of the once-per-process check of an existing runners CSV's header (None until checked)
+_runners_csv_header_ok: bool | None = None
+
+# RaceDetail rows are written by a background thread that commits them in batches
+DB_FLUSH_INTERVAL = 0.2  # seconds
+_db_queue: "queue.Queue[dict]" = queue.Queue()
+_db_writer: threading.Thread | None = None
+_db_writer_lock = threading.Lock()
+
+def save_to_csv(race_id: int, data_type: str, data: dict, timestamp: str, batch: list | None = None):
     """
     Save data to CSV file with each request/response as a separate row
     
@@ -43,45 +70,88 @@ def save_to_csv(race_id: int, data_type: str, data: dict, timestamp: str):
         data_type: Type of data ('prediction_request', 'prediction_response', 'betting_request')
         data: The actual data (dict or string)
         timestamp: ISO timestamp string
+        batch: Optional list to buffer the row into instead of writing it now;
+            flush it later with flush_csv_rows()
+    """
+    try:
+        # Convert data to compact JSON if it's a dict
+        if isinstance(data, dict):
+            data_json = json.dumps(data, separators=(',', ':'), ensure_ascii=False)
+        else:
+            data_json = str(data)
+        
+        row = (timestamp, race_id, data_type, data_json)
+        
+        if batch is not None:
+            batch.append(row)
+            return
+        
+        flush_csv_rows([row])
+        
+    except Exception as e:
+        log.error("Failed to save to CSV: %s", e)
+
+def flush_csv_rows(rows: list[tuple]):
     """
+    Append buffered request/response rows to the CSV file in a single write
+    
+    Args:
+        rows: Row tuples built by save_to_csv(..., batch=rows), in CSV_LOG_HEADERS order
+    """
+    if not rows:
+        return
+    
     try:
         # Ensure CSV file exists with headers
         file_exists = CSV_FILE_PATH.exists()
         
         with open(CSV_FILE_PATH, 'a', newline='', encoding='utf-8') as csvfile:
-            fieldnames = ['timestamp', 'race_id', 'data_type', 'data_json']
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+            writer = csv.writer(csvfile)
             
             # Write header if file is new
             if not file_exists:
-                writer.writeheader()
+                writer.writerow(CSV_LOG_HEADERS)
                 log.info("Created new CSV file: %s", CSV_FILE_PATH)
             
-            # Convert data to JSON string if it's a dict
-            if isinstance(data, dict):
-                data_json = json.dumps(data, ensure_ascii=False)
-            else:
-                data_json = str(data)
-            
-            # Write the row
-            writer.writerow({
-                'timestamp': timestamp,
-                'race_id': race_id,
-                'data_type': data_type,
-                'data_json': data_json
-            })
-            
-        log.info("Saved %s for race %s to CSV", data_type, race_id)
+            writer.writerows(rows)
+        
+        for _, race_id, data_type, _ in rows:
+            log.info("Saved %s for race %s to CSV", data_type, race_id)
         
     except Exception as e:
         log.error("Failed to save to CSV: %s", e)
 
+def _runners_csv_writable() -> bool:
+    """
+    Check once per process that an existing runners CSV has the current header
+    
+    Rows in the current layout appended under an older header would silently
+    misalign every column, so a mismatch is logged and all appends are refused
+    until the file is converted with migrate_csv_logs.py.
+    """
+    global _runners_csv_header_ok
+    if _runners_csv_header_ok is None:
+        header = None
+        if RUNNERS_CSV_PATH.exists():
+            with open(RUNNERS_CSV_PATH, newline='', encoding='utf-8') as csvfile:
+                header = next(csv.reader(csvfile), None)
+        _runners_csv_header_ok = header is None or header == RUNNERS_CSV_HEADERS
+        if not _runners_csv_header_ok:
+            log.error(
+                "%s has an outdated header (%d columns, expected %d); run migrate_csv_logs.py before scraping",
+                RUNNERS_CSV_PATH.name, len(header), len(RUNNERS_CSV_HEADERS),
+            )
+    return _runners_csv_header_ok
+
 def save_runners_to_csv(runners_data: dict, timestamp: str):
     """
-    Save individual runner data to structured CSV file
+    Save race info and individual runner data to structured CSV files
+    
+    Race-level fields (title, meta, track) are written once per race to the
+    race info CSV; the runners CSV only carries Race_ID to link back to it.
     
     Args:
-        runners_data: The race data dict containing runners array
+        runners_data: The race data dict containing race_info and runners array
         timestamp: ISO timestamp string
     """
     try:
@@ -90,556 +160,395 @@ def save_runners_to_csv(runners_data: dict, timestamp: str):
             log.warning("No runners data to save to CSV")
             return
         
+        race_info = runners_data.get('race_info', {})
+        race_id = race_info.get('race_id', '')
+        
+        if not _runners_csv_writable():
+            log.error("Not saving runners for race %s: %s needs migrating", race_id or 'unknown', RUNNERS_CSV_PATH.name)
+            return
+        
+        races_file_exists = RACES_CSV_PATH.exists()
+        
+        with open(RACES_CSV_PATH, 'a', newline='', encoding='utf-8') as csvfile:
+            writer = csv.writer(csvfile)
+            
+            # Write header if file is new
+            if not races_file_exists:
+                writer.writerow(RACES_CSV_HEADERS)
+                log.info("Created new race info CSV file: %s", RACES_CSV_PATH)
+            
+            # Same column order as RACES_CSV_HEADERS
+            writer.writerow((
+                race_id,
+                race_info.get('title', ''),
+                race_info.get('meta', ''),
+                race_info.get('track', ''),
+                timestamp
+            ))
+        
         # Check if CSV file exists
         file_exists = RUNNERS_CSV_PATH.exists()
         
-        # Define CSV headers matching your specification
-        headers = [
-            'Race_ID', 'Title', 'Meta', 'Track', 'Place', 'Number', 'Horse_Name', 
-            'Jockey', 'Age_Sex', 'Equipment', 'Weight', 'Times', 
-            'Odds_Morning', 'Odds_Live', 'Trainer', 'Distance', 'Musique', 'Additional_Info'
+        # Runner keys in header order after Race_ID; rows are built up front and written in one call
+        fields = [
+            'place', 'number', 'horse_name',
+            'jockey', 'age_sex', 'equipment', 'weight', 'times',
+            'odds_morning', 'odds_live', 'trainer', 'distance', 'musique'
         ]
+        rows = [(race_id, *(runner.get(field, '') for field in fields)) for runner in runners]
         
         with open(RUNNERS_CSV_PATH, 'a', newline='', encoding='utf-8') as csvfile:
-            writer = csv.DictWriter(csvfile, fieldnames=headers)
+            writer = csv.writer(csvfile)
             
             # Write header if file is new
             if not file_exists:
-                writer.writeheader()
+                writer.writerow(RUNNERS_CSV_HEADERS)
                 log.info("Created new runners CSV file: %s", RUNNERS_CSV_PATH)
             
-            # Write each runner as a separate row
-            for runner in runners:
-                writer.writerow({
-                    'Race_ID': runner.get('race_id', ''),
-                    'Title': runner.get('title', ''),
-                    'Meta': runner.get('meta', ''),
-                    'Track': runner.get('track', ''),
-                    'Place': runner.get('place', ''),
-                    'Number': runner.get('number', ''),
-                    'Horse_Name': runner.get('horse_name', ''),
-                    'Jockey': runner.get('jockey', ''),
-                    'Age_Sex': runner.get('age_sex', ''),
-                    'Equipment': runner.get('equipment', ''),
-                    'Weight': runner.get('weight', ''),
-                    'Times': runner.get('times', ''),
-                    'Odds_Morning': runner.get('odds_morning', ''),
-                    'Odds_Live': runner.get('odds_live', ''),
-                    'Trainer': runner.get('trainer', ''),
-                    'Distance': runner.get('distance', ''),
-                    'Musique': runner.get('musique', ''),
-                    'Additional_Info': runner.get('additional_info', '')
-                })
+            writer.writerows(rows)
         
-        log.info("Saved %d runners to CSV for race %s", len(runners), runners_data.get('race_info', {}).get('race_id', 'unknown'))
+        log.info("Saved %d runners to CSV for race %s", len(runners), race_id or 'unknown')
         
     except Exception as e:
         log.error("Failed to save runners to CSV: %s", e)
 
-def _scrape_sync(race_id: int):
-    log.info("→ _scrape_sync starting for race_id=%d", race_id)
+# Prediction fields the betting server doesn't need (bet_amount is renamed to bet_percentage)
+_DROPPED_RECOMMENDATION_FIELDS = frozenset({
+    "confidence", "edge", "estimated_place_odds", "kelly_fraction", "strategy", "win_odds", "bet_amount",
+})
+
+def _db_writer_loop():
+    """Drain the RaceDetail queue every DB_FLUSH_INTERVAL and commit each batch in one transaction."""
+    while True:
+        batch = [_db_queue.get()]
+        time.sleep(DB_FLUSH_INTERVAL)
+        while True:
+            try:
+                batch.append(_db_queue.get_nowait())
+            except queue.Empty:
+                break
+        try:
+            with Session(engine) as sess:
+                sess.bulk_insert_mappings(RaceDetail, batch)
+                sess.commit()
+            log.info("💾 Saved %d RaceDetail row(s)", len(batch))
+        except Exception:
+            log.exception("❌ Failed to save %d RaceDetail row(s)", len(batch))
+        finally:
+            for _ in batch:
+                _db_queue.task_done()
+
+def queue_race_detail(**fields):
+    """Hand a RaceDetail row to the background writer, starting it on first use."""
+    global _db_writer
+    # bulk_insert_mappings skips model defaults, so stamp the row here
+    fields.setdefault("scraped_at", datetime.utcnow())
+    with _db_writer_lock:
+        if _db_writer is None or not _db_writer.is_alive():
+            _db_writer = threading.Thread(target=_db_writer_loop, name="race-detail-writer", daemon=True)
+            _db_writer.start()
+    _db_queue.put(fields)
+
+def flush_race_details():
+    """Block until every queued RaceDetail row has been committed."""
+    _db_queue.join()
+
+atexit.register(flush_race_details)
+
+def _format_recommendation(r: dict, unibet_id: str, number_by_name: dict) -> dict:
+    """Build the betting server's version of one prediction recommendation."""
+    horse_name = r.get("horse_name", "")
+    horse_number = number_by_name.get(horse_name.strip().upper())
+
+    rec = {k: v for k, v in r.items() if k not in _DROPPED_RECOMMENDATION_FIELDS}
+    rec["race_id"] = unibet_id
+    if "bet_amount" in r:
+        rec["bet_percentage"] = r["bet_amount"]
+
+    if horse_number:
+        rec["horse_number"] = int(horse_number) if horse_number.isdigit() else horse_number
+    else:
+        log.warning("⚠️ Could not find horse_number for '%s'", horse_name)
+    return rec
+
+async def _extract_race_data(context, race_id: int, url: str) -> dict | None:
+    """Open the race page in the given context and run the runners extractor on it.
+
+    The context must have RUNNERS_INIT_SCRIPT installed (see add_init_script).
+    """
+    page = await context.new_page()
+    try:
+        return await load_and_extract(page, url)
+    finally:
+        await page.close()
+
+async def _process_race_data(
+    client: httpx.AsyncClient,
+    race_id: int,
+    url: str,
+    unibet_id: str,
+    race_data: dict | None,
+    prediction_response: dict | None = None,
+):
+    """
+    Log, predict, forward and persist one scraped race
+    
+    Args:
+        client: Shared HTTP client for the predict / place-bets servers
+        race_id: Our DB id of the race
+        url: Race page URL
+        unibet_id: Unibet's race id, sent along with each recommendation
+        race_data: Output of the runners extractor (None if extraction failed)
+        prediction_response: Parsed prediction when it was already fetched in a batch
+    """
+    prediction_request = None
+    forwarded_payload = None
+    timestamp = datetime.utcnow().isoformat() + "Z"
+    _pending_rows: list[tuple] = []
+
+    if race_data and race_data.get('runners'):
+        try:
+            # Store the request data that we're about to send
+            prediction_request = race_data
+        
+            # Extract the scraped race_id for CSV logging
+            scraped_race_id = race_data.get('race_info', {}).get('race_id', str(race_id))
+        
+            # Save prediction request to CSV (existing functionality)
+            save_to_csv(scraped_race_id, "prediction_request", prediction_request, timestamp, batch=_pending_rows)
+        
+            # NEW: Save individual runners to structured CSV
+            save_runners_to_csv(race_data, timestamp)
+        
+            # A batched scrape hands us the prediction already; otherwise ask for it now
+            if prediction_response is None:
+                # Send structured JSON data instead of HTML
+                headers = {"Content-Type": "application/json"}
+                resp = await client.post(PREDICT_URL, json=race_data, headers=headers)
+                resp.raise_for_status()
+                # Raw text first, so an unparseable answer is still stored for debugging
+                prediction_response = resp.text
+                log.info("📬 Sent race %d to prediction server (status %d)", race_id, resp.status_code)
+                prediction_response = json.loads(prediction_response)
+
+            # Parsed once; this dict is what gets logged, used and stored
+            parsed = prediction_response
+            save_to_csv(scraped_race_id, "prediction_response", parsed, timestamp, batch=_pending_rows)
+
+            # Index the scraped runners once instead of scanning them for every recommendation
+            # (reversed so the first runner wins when two names normalise the same)
+            number_by_name = {
+                runner.get("horse_name", "").strip().upper(): runner.get("number", "")
+                for runner in reversed(race_data.get("runners", []))
+            }
 
-    if sys.platform.startswith("win"):
-        policy = asyncio.get_event_loop_policy()
-        if not isinstance(policy, asyncio.WindowsProactorEventLoopPolicy):
-            log.debug("Setting WindowsProactorEventLoopPolicy")
-            asyncio.set_event_loop_policy(asyncio.WindowsProactorEventLoopPolicy())
+            # Process recommendations to match betting server format
+            recommendations = [
+                _format_recommendation(r, unibet_id, number_by_name)
+                for r in parsed.get("recommendations", [])
+            ]
 
-    with Session(engine) as sess:
-        race = sess.exec(select(Race).where(Race.id == race_id)).one()
-    url = race.url
+            # Copy so the forwarded fields never leak into the stored prediction_response
+            summary = dict(parsed.get("summary", {}))
+            summary.setdefault("boulot_bets", 0)
+        
+            # Count bet types for the summary in a single pass
+            bet_counts = Counter(r.get("bet_type") for r in recommendations)
+            win_bets = bet_counts["win"]
+            place_bets = bet_counts["place"]
+            deuzio_bets = bet_counts["deuzio"]
+        
+            # Update summary with required fields
+            summary.update({
+                "total_bet_amount": summary.get("total_amount", 0),  # Map total_amount to total_bet_amount
+                "win_bets": win_bets,
+                "place_bets": place_bets, 
+                "deuzio_bets": deuzio_bets,
+                "timestamp": timestamp
+            })
+
+            forwarded_payload = {
+                "race_url": url,
+                "recommendations": recommendations,
+                "summary": summary,
+            }
+
+            # Save betting request to CSV
+            save_to_csv(scraped_race_id, "betting_request", forwarded_payload, timestamp, batch=_pending_rows)
+
+            # pformat walks the whole payload, so only pay for it when DEBUG is on
+            if log.isEnabledFor(logging.DEBUG):
+                log.debug("📦 Forwarding payload to place-bets:\n%s", pprint.pformat(forwarded_payload))
+            forward_resp = await client.post(FORWARD_URL, json=forwarded_payload)
+            try:
+                forward_resp.raise_for_status()
+            except httpx.HTTPStatusError as e:
+                log.error("❌ Failed with %s\nResponse body:\n%s", e, forward_resp.text)
+                raise
+            log.info("🚀 Forwarded prediction to %s (status %d)", FORWARD_URL, forward_resp.status_code)
+
+        except Exception as e:
+            log.exception("❌ Failed during prediction or forwarding for race %d: %s", race_id, e)
+
+        # Write all request/response rows for this race in one go
+        flush_csv_rows(_pending_rows)
+
+        # The raw row text only feeds the extractor's fallback parser; don't persist it
+        for runner in race_data['runners']:
+            runner.pop('additional_info', None)
+
+        queue_race_detail(
+            race_id=race_id,
+            bookmarklet_json=race_data,
+            prediction_request=prediction_request,
+            prediction_response=prediction_response,
+            betting_request=forwarded_payload,
+            race_url=url,
+        )
+        log.info("✅ Queued RaceDetail for race %d", race_id)
+    else:
+        log.error("❌ No runner data extracted for race %d", race_id)
+
+async def _scrape_async(race_id: int, url: str | None = None, unibet_id: str | None = None):
+    log.info("→ _scrape_async starting for race_id=%d", race_id)
+
+    # Callers normally pass what they already know about the race; older
+    # persisted jobs only carry the id, so look it up in that case
+    if url is None or unibet_id is None:
+        with Session(engine) as sess:
+            race = sess.exec(select(Race).where(Race.id == race_id)).one()
+        url, unibet_id = race.url, race.unibet_id
     log.info("→ Scraping race %d @ %s", race_id, url)
 
     try:
-        with sync_playwright() as p:
-            log.debug("Launching headless Chromium")
-            browser = p.chromium.launch(headless=True)
-            page = browser.new_page()
+        pool = get_browser_pool()
+        context = await pool.acquire()
+        try:
+            await context.route("**/*", block_heavy_resources)
+            await context.add_init_script(RUNNERS_INIT_SCRIPT)
+            race_data = await _extract_race_data(context, race_id, url)
+        finally:
+            # Free the context as soon as extraction is done; the rest is HTTP + DB work
+            await pool.release(context)
+
+        async with httpx.AsyncClient(timeout=10.0) as client:
+            await _process_race_data(client, race_id, url, unibet_id, race_data)
 
-            log.debug("Navigating to page (networkidle)")
-            page.goto(url, wait_until="networkidle", timeout=60_000)
+    except NotImplementedError as nie:
+        log.error("🔴 Playwright subprocess creation failed: %s", nie)
+        log.error("   └─ Ensure ProactorEventLoopPolicy on Windows before starting uvicorn")
+    except Exception:
+        log.exception("🐛 Unexpected error in _scrape_async for race %d", race_id)
 
-            # First try to click on "Tableau des partants" if it exists
-            try:
-                tableau_button = page.locator("span.text:has-text('Tableau des partants')")
-                if tableau_button.count() > 0:
-                    tableau_button.click()
-                    page.wait_for_timeout(2000)  # Wait for content to load
-            except Exception as e:
-                log.warning("Could not click 'Tableau des partants': %s", e)
-
-            log.debug("Running runners extraction JavaScript")
-            
-            # Enhanced JavaScript that extracts structured runner data
-            js = """
-            () => {
-                // Race title block
-                let title = document
-                  .querySelector('.race-head-title.ui-mainview-block')
-                  ?.innerText.trim() || "race_data";
-
-                // Meta info block (date, track, etc.)
-                let meta = document
-                  .querySelector('.race-meta.ui-mainview-block')
-                  ?.innerText.trim() || "No meta found";
-
-                // Track name
-                let track = document
-                  .querySelector('.ui-left')
-                  ?.innerText.trim() || "Track not found";
-
-                // Generate race_id from URL
-                let race_id = '';
-                const currentUrl = window.location.href;
-                const urlMatch = currentUrl.match(/race\/([^\/]+?)(?:\.html)?(?:\?|$)/);
-                if (urlMatch) {
-                    race_id = urlMatch[1];
-                } else {
-                    const titlePart = title.replace(/[^a-zA-Z0-9]/g, '').substring(0, 20);
-                    const trackPart = track.replace(/[^a-zA-Z0-9]/g, '');
-                    race_id = `${titlePart}_${trackPart}`.toLowerCase();
-                }
-                
-                let runners = [];
-                
-                // Method 1: Parse structured runner list - prioritize the detailed table
-                let runnerItems = document.querySelectorAll('ul.runners-list:not(.bottom-list) li.runner-item');
-                
-                // Find the best list with most columns
-                const allLists = document.querySelectorAll('ul.runners-list');
-                let bestList = null;
-                let maxColumns = 0;
-                
-                allLists.forEach(list => {
-                    const legendItem = list.querySelector('li.legend');
-                    if (legendItem) {
-                        const columnCount = legendItem.querySelectorAll('div, span').length;
-                        if (columnCount > maxColumns) {
-                            maxColumns = columnCount;
-                            bestList = list;
-                        }
-                    }
-                });
-                
-                if (bestList) {
-                    runnerItems = bestList.querySelectorAll('li.runner-item');
-                }
-                
-                // Collect race results data
-                const resultsData = {};
-                const resultsTables = document.querySelectorAll('ul.runners-list:not(.bottom-list):not(:has(.betrunners-legend))');
-                
-                resultsTables.forEach(table => {
-                    const resultItems = table.querySelectorAll('li.runner-item');
-                    resultItems.forEach(item => {
-                        const numberEl = item.querySelector('.rank span');
-                        const placeEl = item.querySelector('.position span');
-                        const timeEl = item.querySelector('.time span');
-                        const reductionEl = item.querySelector('.reduction.more span');
-                        
-                        if (numberEl) {
-                            const number = numberEl.innerText.trim();
-                            resultsData[number] = {
-                                place: placeEl ? placeEl.innerText.trim() : '',
-                                times: ''
-                            };
-                            
-                            if (reductionEl && reductionEl.innerText.trim() && reductionEl.innerText.trim() !== '-') {
-                                resultsData[number].times = reductionEl.innerText.trim();
-                            }
-                            if (timeEl && timeEl.innerText.trim() && timeEl.innerText.trim() !== '-') {
-                                if (resultsData[number].times) {
-                                    resultsData[number].times += ' / ' + timeEl.innerText.trim();
-                                } else {
-                                    resultsData[number].times = timeEl.innerText.trim();
-                                }
-                            }
-                        }
-                    });
-                });
-                
-                // Check bottom-list for DNF runners
-                const bottomList = document.querySelector('ul.runners-list.bottom-list');
-                if (bottomList) {
-                    const bottomItems = bottomList.querySelectorAll('li.runner-item');
-                    bottomItems.forEach(item => {
-                        const numberEl = item.querySelector('.rank span');
-                        const placeEl = item.querySelector('.position span, .position small');
-                        
-                        if (numberEl) {
-                            const number = numberEl.innerText.trim();
-                            resultsData[number] = {
-                                place: placeEl ? placeEl.innerText.trim() : '-',
-                                times: '-'
-                            };
-                        }
-                    });
-                }
-                
-                runnerItems.forEach((item, index) => {
-                    let runner = {
-                        race_id: race_id,
-                        title: title,
-                        meta: meta,
-                        track: track,
-                        place: '',
-                        number: '',
-                        horse_name: '',
-                        jockey: '',
-                        age_sex: '',
-                        equipment: '',
-                        weight: '',
-                        times: '',
-                        odds_morning: '',
-                        odds_live: '',
-                        trainer: '',
-                        distance: '',
-                        musique: '',
-                        additional_info: ''
-                    };
-                    
-                    // Extract finishing place
-                    const positionEl = item.querySelector('.position span');
-                    if (positionEl) {
-                        const positionText = positionEl.innerText.trim();
-                        if (positionText.includes('er') || positionText.includes('e')) {
-                            runner.place = positionText;
-                        } else if (positionText === 'DAI') {
-                            runner.place = 'DAI';
-                        }
-                    }
-                    
-                    // Extract horse number and merge with results
-                    const numberEl = item.querySelector('.rank .number, .rank span');
-                    if (numberEl) {
-                        runner.number = numberEl.innerText.trim();
-                        
-                        if (resultsData[runner.number]) {
-                            runner.place = resultsData[runner.number].place;
-                            if (!runner.times) {
-                                runner.times = resultsData[runner.number].times;
-                            }
-                        }
-                    }
-                    
-                    // Extract horse name
-                    const horseEl = item.querySelector('.horse-name, .info-horse');
-                    if (horseEl) {
-                        runner.horse_name = horseEl.innerText.trim();
-                    }
-                    
-                    // Extract jockey name
-                    const jockeyEl = item.querySelector('.jockey-name, .info-jockey');
-                    if (jockeyEl) {
-                        runner.jockey = jockeyEl.innerText.trim();
-                    }
-                    
-                    // Extract age/sex
-                    const ageEl = item.querySelector('.age.more');
-                    if (ageEl) {
-                        runner.age_sex = ageEl.innerText.trim();
-                    }
-                    
-                    // Extract equipment (shoes)
-                    const equipmentEl = item.querySelector('.shoes.more .icon-shoes, .shoes.more span');
-                    if (equipmentEl) {
-                        const equipmentClass = equipmentEl.className;
-                        if (equipmentClass.includes('FORE')) runner.equipment = 'FORE';
-                        else if (equipmentClass.includes('HIND')) runner.equipment = 'HIND';
-                        else if (equipmentClass.includes('BOTH')) runner.equipment = 'BOTH';
-                        else if (equipmentEl.innerText.trim()) runner.equipment = equipmentEl.innerText.trim();
-                    }
-                    
-                    // Extract weight
-                    const weightEl = item.querySelector('.weight.more, .poids.more');
-                    if (weightEl) {
-                        runner.weight = weightEl.innerText.trim();
-                    }
-                    
-                    // Extract trainer
-                    const trainerEl = item.querySelector('.trainer.more');
-                    if (trainerEl) {
-                        runner.trainer = trainerEl.innerText.trim();
-                    }
-                    
-                    // Extract distance
-                    const distanceEl = item.querySelector('.distance.more');
-                    if (distanceEl) {
-                        runner.distance = distanceEl.innerText.trim();
-                    }
-                    
-                    // Extract musique (performance history)
-                    const musiqueEl = item.querySelector('.musique.more, .info-musique');
-                    if (musiqueEl) {
-                        runner.musique = musiqueEl.innerText.trim();
-                    }
-                    
-                    // Extract odds - morning and live prices
-                    const pricesContainer = item.querySelector('.prices');
-                    if (pricesContainer) {
-                        const morningPrice = pricesContainer.querySelector('.price-morning');
-                        const livePrice = pricesContainer.querySelector('.price-live');
-                        
-                        if (morningPrice) runner.odds_morning = morningPrice.innerText.trim();
-                        if (livePrice) runner.odds_live = livePrice.innerText.trim();
-                        
-                        if (!runner.odds_morning && !runner.odds_live) {
-                            const anyPrice = pricesContainer.querySelector('span');
-                            if (anyPrice) runner.odds_live = anyPrice.innerText.trim();
-                        }
-                    }
-                    
-                    // Extract times for finished races
-                    const reductionEl = item.querySelector('.reduction.more span');
-                    const timeEl = item.querySelector('.time span');
-                    
-                    if (reductionEl && reductionEl.innerText.trim() && reductionEl.innerText.trim() !== '-') {
-                        runner.times = reductionEl.innerText.trim();
-                    }
-                    if (timeEl && timeEl.innerText.trim() && timeEl.innerText.trim() !== '-') {
-                        if (runner.times) {
-                            runner.times += ' / ' + timeEl.innerText.trim();
-                        } else {
-                            runner.times = timeEl.innerText.trim();
-                        }
-                    }
-                    
-                    // Store raw data
-                    runner.additional_info = item.innerText.replace(/\\s+/g, ' ').trim();
-                    
-                    // Fallback parsing if core data missing
-                    if (!runner.horse_name && runner.additional_info) {
-                        const cleanText = runner.additional_info;
-                        const numberMatch = cleanText.match(/^(\\d+)\\s+([A-Z\\s]+?)(?=[A-Z][a-z])/);
-                        if (numberMatch) {
-                            if (!runner.number) runner.number = numberMatch[1];
-                            if (!runner.horse_name) runner.horse_name = numberMatch[2].trim();
-                        }
-                        
-                        const ageMatch = cleanText.match(/([FHM]\\/\\d+)/);
-                        if (ageMatch && !runner.age_sex) {
-                            runner.age_sex = ageMatch[1];
-                        }
-                        
-                        const distanceMatch = cleanText.match(/(\\d+m)/);
-                        if (distanceMatch && !runner.distance) {
-                            runner.distance = distanceMatch[1];
-                        }
-                        
-                        const oddsMatch = cleanText.match(/([\\d.]+)(?:\\s+([\\d.]+))?\\s*$/);
-                        if (oddsMatch) {
-                            if (oddsMatch[2]) {
-                                if (!runner.odds_morning) runner.odds_morning = oddsMatch[1];
-                                if (!runner.odds_live) runner.odds_live = oddsMatch[2];
-                            } else {
-                                if (!runner.odds_live) runner.odds_live = oddsMatch[1];
-                            }
-                        }
-                    }
-                    
-                    // Only add if we have a horse name
-                    if (runner.horse_name && runner.horse_name.length > 1) {
-                        runners.push(runner);
-                    }
-                });
-                
-                // Fallback text parsing if no structured data
-                if (runners.length === 0) {
-                    const runnerLists = document.querySelectorAll('.runners-list');
-                    let consolidatedText = '';
-                    
-                    runnerLists.forEach(runnerList => {
-                        consolidatedText += runnerList.innerText + '\\n';
-                    });
-                    
-                    const lines = consolidatedText.split(/\\n/).filter(line => line.trim());
-                    
-                    lines.forEach(line => {
-                        const horseMatch = line.match(/([A-Z][A-Z\\s]{2,}?)([A-Z][a-z]+(?:\\s+[A-Z][a-z]*)*)/);
-                        
-                        if (horseMatch) {
-                            runners.push({
-                                race_id: race_id,
-                                title: title,
-                                meta: meta,
-                                track: track,
-                                place: '',
-                                number: '',
-                                horse_name: horseMatch[1].trim(),
-                                jockey: horseMatch[2].trim(),
-                                age_sex: '',
-                                equipment: '',
-                                weight: '',
-                                times: '',
-                                odds_morning: '',
-                                odds_live: '',
-                                trainer: '',
-                                distance: '',
-                                musique: '',
-                                additional_info: line.trim()
-                            });
-                        }
-                    });
-                }
-
-                // Remove duplicates
-                const uniqueRunners = [];
-                const seenHorses = new Set();
-                
-                runners.forEach(runner => {
-                    if (runner.horse_name && !seenHorses.has(runner.horse_name)) {
-                        seenHorses.add(runner.horse_name);
-                        uniqueRunners.push(runner);
-                    }
-                });
-
-                return {
-                    race_info: {
-                        race_id: race_id,
-                        title: title,
-                        meta: meta,
-                        track: track,
-                        url: window.location.href
-                    },
-                    runners: uniqueRunners,
-                    scraped_at: new Date().toISOString()
-                };
-            }
-            """
-            
-            try:
-                race_data = page.evaluate(js)
-                log.info("✔ Runners extraction returned %d runners", len(race_data.get('runners', [])))
-            except PlaywrightTimeoutError:
-                log.error("⏰ Timeout running runners extraction on race %d", race_id)
+async def _predict_batch(client: httpx.AsyncClient, payloads: list[dict]) -> list[dict] | None:
+    """
+    Send several races to the prediction server in a single request
+    
+    Returns one parsed response per payload (same order), or None if the
+    server has no batch endpoint or answered unexpectedly, in which case the
+    caller falls back to one request per race.
+    """
+    try:
+        resp = await client.post(PREDICT_BATCH_URL, json=payloads)
+        if resp.status_code in (404, 405):
+            log.info("Prediction server has no batch endpoint, falling back to per-race requests")
+            return None
+        resp.raise_for_status()
+        results = resp.json()
+    except Exception as e:
+        log.warning("Batch prediction failed (%s), falling back to per-race requests", e)
+        return None
+
+    if not isinstance(results, list) or len(results) != len(payloads):
+        log.warning("Batch prediction returned an unexpected shape, falling back to per-race requests")
+        return None
+
+    log.info("📬 Sent %d races to prediction server in one batch (status %d)", len(payloads), resp.status_code)
+    return results
+
+async def scrape_meeting(race_ids: list[int]):
+    """
+    Scrape several races concurrently (typically the races of one meeting)
+    
+    All pages share one pooled browser context, and the prediction requests
+    are sent as a single batch when the prediction server supports it.
+    """
+    log.info("→ scrape_meeting starting for %d races", len(race_ids))
+
+    with Session(engine) as sess:
+        races = sess.exec(select(Race).where(Race.id.in_(race_ids))).all()
+
+    try:
+        pool = get_browser_pool()
+        context = await pool.acquire()
+        try:
+            await context.route("**/*", block_heavy_resources)
+            await context.add_init_script(RUNNERS_INIT_SCRIPT)
+            results = await asyncio.gather(
+                *(_extract_race_data(context, race.id, race.url) for race in races),
+                return_exceptions=True,
+            )
+        finally:
+            await pool.release(context)
+
+        scraped = []
+        for race, race_data in zip(races, results):
+            if isinstance(race_data, BaseException):
+                log.error("❌ Extraction failed for race %d: %s", race.id, race_data)
                 race_data = None
+            scraped.append((race, race_data))
+
+        async with httpx.AsyncClient(timeout=10.0) as client:
+            to_predict = [(race, race_data) for race, race_data in scraped if race_data and race_data.get('runners')]
+            predictions = await _predict_batch(client, [race_data for _, race_data in to_predict]) if to_predict else None
+            prediction_by_race = (
+                {race.id: prediction for (race, _), prediction in zip(to_predict, predictions)}
+                if predictions else {}
+            )
 
-            prediction_response = None
-            prediction_request = None
-            forwarded_payload = None
-            timestamp = datetime.utcnow().isoformat() + "Z"
-
-            if race_data and race_data.get('runners'):
-                try:
-                    # Store the request data that we're about to send
-                    prediction_request = race_data
-                    
-                    # Extract the scraped race_id for CSV logging
-                    scraped_race_id = race_data.get('race_info', {}).get('race_id', str(race_id))
-                    
-                    # Save prediction request to CSV (existing functionality)
-                    save_to_csv(scraped_race_id, "prediction_request", prediction_request, timestamp)
-                    
-                    # NEW: Save individual runners to structured CSV
-                    save_runners_to_csv(race_data, timestamp)
-                    
-                    # Send structured JSON data instead of HTML
-                    headers = {"Content-Type": "application/json"}
-                    resp = httpx.post(PREDICT_URL, json=race_data, headers=headers, timeout=10.0)
-                    resp.raise_for_status()
-                    prediction_response = resp.text
-                    log.info("📬 Sent race %d to prediction server (status %d)", race_id, resp.status_code)
-
-                    # Parse response and save to CSV
-                    parsed = json.loads(prediction_response)
-                    save_to_csv(scraped_race_id, "prediction_response", parsed, timestamp)
-
-                    recommendations = parsed.get("recommendations", [])
-                    
-                    # Process recommendations to match betting server format
-                    for r in recommendations:
-                        # Add race_id
-                        r["race_id"] = race.unibet_id
-                        
-                        # Rename bet_amount to bet_percentage
-                        if "bet_amount" in r:
-                            r["bet_percentage"] = r.pop("bet_amount")
-                        
-                        # Find horse_number from scraped data by matching horse_name
-                        horse_name = r.get("horse_name", "")
-                        horse_number = None
-                        
-                        # Look up horse number from the scraped runners data
-                        for runner in race_data.get("runners", []):
-                            if runner.get("horse_name", "").strip().upper() == horse_name.strip().upper():
-                                horse_number = runner.get("number", "")
-                                break
-                        
-                        if horse_number:
-                            r["horse_number"] = int(horse_number) if horse_number.isdigit() else horse_number
-                        else:
-                            log.warning("⚠️ Could not find horse_number for '%s'", horse_name)
-                        
-                        # Remove extra fields that betting server doesn't need
-                        fields_to_remove = ["confidence", "edge", "estimated_place_odds", "kelly_fraction", "strategy", "win_odds"]
-                        for field in fields_to_remove:
-                            r.pop(field, None)
-
-                    summary = parsed.get("summary", {})
-                    summary.setdefault("boulot_bets", 0)
-                    
-                    # Count bet types for the summary
-                    win_bets = len([r for r in recommendations if r.get("bet_type") == "win"])
-                    place_bets = len([r for r in recommendations if r.get("bet_type") == "place"])
-                    deuzio_bets = len([r for r in recommendations if r.get("bet_type") == "deuzio"])
-                    
-                    # Update summary with required fields
-                    summary.update({
-                        "total_bet_amount": summary.get("total_amount", 0),  # Map total_amount to total_bet_amount
-                        "win_bets": win_bets,
-                        "place_bets": place_bets, 
-                        "deuzio_bets": deuzio_bets,
-                        "timestamp": timestamp
-                    })
-
-                    forwarded_payload = {
-                        "race_url": url,
-                        "recommendations": recommendations,
-                        "summary": summary,
-                    }
-
-                    # Save betting request to CSV
-                    save_to_csv(scraped_race_id, "betting_request", forwarded_payload, timestamp)
-
-                    log.debug("📦 Forwarding payload to place-bets:\n%s", pprint.pformat(forwarded_payload))
-                    forward_resp = httpx.post(FORWARD_URL, json=forwarded_payload, timeout=10.0)
-                    try:
-                        forward_resp.raise_for_status()
-                    except httpx.HTTPStatusError as e:
-                        log.error("❌ Failed with %s\nResponse body:\n%s", e, forward_resp.text)
-                        raise
-                    log.info("🚀 Forwarded prediction to %s (status %d)", FORWARD_URL, forward_resp.status_code)
-
-                except Exception as e:
-                    log.exception("❌ Failed during prediction or forwarding for race %d: %s", race_id, e)
-
-                with Session(engine) as sess:
-                    race_detail = RaceDetail(
-                        race_id=race_id,
-                        bookmarklet_json=race_data,
-                        prediction_request=prediction_request,
-                        prediction_response=prediction_response,
-                        betting_request=forwarded_payload,
-                        race_url=url,
-                    )
-                    sess.add(race_detail)
-                    sess.commit()
-                log.info("✅ Saved RaceDetail for race %d", race_id)
-            else:
-                log.error("❌ No runner data extracted for race %d", race_id)
-
-            browser.close()
+            await asyncio.gather(*(
+                _process_race_data(client, race.id, race.url, race.unibet_id, race_data, prediction_by_race.get(race.id))
+                for race, race_data in scraped
+            ))
 
     except NotImplementedError as nie:
         log.error("🔴 Playwright subprocess creation failed: %s", nie)
         log.error("   └─ Ensure ProactorEventLoopPolicy on Windows before starting uvicorn")
     except Exception:
-        log.exception("🐛 Unexpected error in _scrape_sync for race %d", race_id)
+        log.exception("🐛 Unexpected error in scrape_meeting for races %s", race_ids)
+
+async def _close_pool_after(coro):
+    try:
+        return await coro
+    finally:
+        await close_browser_pool()
+
+def _run_blocking(coro):
+    """Run a scrape coroutine on a private event loop and close its browser pool afterwards."""
+    if sys.platform.startswith("win"):
+        policy = asyncio.get_event_loop_policy()
+        if not isinstance(policy, asyncio.WindowsProactorEventLoopPolicy):
+            log.debug("Setting WindowsProactorEventLoopPolicy")
+            asyncio.set_event_loop_policy(asyncio.WindowsProactorEventLoopPolicy())
+
+    try:
+        return asyncio.run(_close_pool_after(coro))
+    finally:
+        # Scripts read RaceDetail back right after this returns
+        flush_race_details()
+
+def _scrape_sync(race_id: int, url: str | None = None, unibet_id: str | None = None):
+    """Blocking entry point for scripts: scrape one race."""
+    _run_blocking(_scrape_async(race_id, url, unibet_id))
+
+def _scrape_meeting_sync(race_ids: list[int]):
+    """Blocking entry point for scripts: scrape several races as one batch."""
+    _run_blocking(scrape_meeting(race_ids))
 
-async def run_race_scrape(race_id: int):
+async def run_race_scrape(race_id: int, url: str | None = None, unibet_id: str | None = None):
     log.info("Scheduling scrape for race %d", race_id)
-    loop = asyncio.get_running_loop()
-    await loop.run_in_executor(None, _scrape_sync, race_id)
+    # Runs on the scheduler's loop so every race shares that loop's browser pool
+    await _scrape_async(race_id, url, unibet_id)
 
 def schedule_race_scrape(race: Race):
     """Schedule a race scrape job - imported by daily.py"""
@@ -652,8 +561,11 @@ if __name__ == "__main__":
     if sys.platform.startswith("win"):
         asyncio.set_event_loop_policy(asyncio.WindowsProactorEventLoopPolicy())
 
-    parser = argparse.ArgumentParser(description="Scrape one race detail by DB ID")
-    parser.add_argument("race_id", type=int, help="Race.id to scrape")
+    parser = argparse.ArgumentParser(description="Scrape race details by DB ID")
+    parser.add_argument("race_ids", type=int, nargs="+", help="Race.id(s) to scrape; several are scraped as one batch")
     args = parser.parse_args()
 
-    _scrape_sync(args.race_id)
\ No newline at end of file
+    if len(args.race_ids) == 1:
+        _scrape_sync(args.race_ids[0])
+    else:
+        _scrape_meeting_sync(args.race_ids)
\ No newline at end of file
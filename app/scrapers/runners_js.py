@@ -0,0 +1,463 @@
+# app/scrapers/runners_js.py
+# Race page loading and the runner extractor, shared by the race scraper and
+# test_runner_extraction.py. Importing this module has no side effects.
+
+import asyncio
+import logging
+import re
+
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+
+log = logging.getLogger(__name__)
+
+# Race pages live at .../race/<slug>.html; the slug is the race_id in the CSV logs
+RACE_SLUG_RE = re.compile(r"race/([^/]+?)(?:\.html)?(?:\?|$)")
+
+# Navigation fails fast and is retried with backoff rather than waiting out one long timeout
+NAV_TIMEOUT_MS = 10_000
+NAV_ATTEMPTS = 3
+
+# Assets the extractor never reads; stylesheets stay because innerText depends on them
+BLOCKED_RESOURCE_TYPES = frozenset({"image", "font", "media"})
+
+async def block_heavy_resources(route):
+    """Abort requests for assets the extractor doesn't need, let everything else through."""
+    if route.request.resource_type in BLOCKED_RESOURCE_TYPES:
+        await route.abort()
+    else:
+        await route.continue_()
+
+async def goto_with_retry(page, url: str) -> None:
+    """Navigate to url, retrying timed-out attempts; the last timeout is re-raised."""
+    for attempt in range(NAV_ATTEMPTS):
+        try:
+            await page.goto(url, wait_until="domcontentloaded", timeout=NAV_TIMEOUT_MS)
+            return
+        except PlaywrightTimeoutError:
+            if attempt == NAV_ATTEMPTS - 1:
+                log.error("⏰ Navigation to %s timed out %d times, giving up", url, NAV_ATTEMPTS)
+                raise
+            log.warning("Navigation to %s timed out (attempt %d/%d), retrying", url, attempt + 1, NAV_ATTEMPTS)
+            await asyncio.sleep(2 ** attempt)
+
+def unpack_runners(race_data: dict) -> dict:
+    """Rebuild the runner dicts from the extractor's compact header + rows form."""
+    header = race_data.pop('header', [])
+    race_data['runners'] = [dict(zip(header, row)) for row in race_data.pop('rows', [])]
+    return race_data
+
+def race_slug(url: str) -> str | None:
+    """Return the race slug from a race page URL, or None if the URL has none."""
+    match = RACE_SLUG_RE.search(url)
+    return match.group(1) if match else None
+
+# Runner extraction script, evaluated in the race page with the URL slug as its argument
+RUNNERS_JS = """
+(raceSlug) => {
+    // Patterns compiled once per extraction instead of at each use
+    const RX_WS = /\\s+/g;
+    const RX_NUMBER = /^(\\d+)\\s+([A-Z\\s]+?)(?=[A-Z][a-z])/;
+    const RX_AGE = /([FHM]\\/\\d+)/;
+    const RX_DIST = /(\\d+m)/;
+    const RX_ODDS = /([\\d.]+)(?:\\s+([\\d.]+))?\\s*$/;
+    const RX_HORSE_LINE = /([A-Z][A-Z\\s]{2,}?)([A-Z][a-z]+(?:\\s+[A-Z][a-z]*)*)/;
+    const RX_NON_ALNUM = /[^a-zA-Z0-9]/g;
+    const RX_NEWLINE = /\\n/;
+
+    // Class-name lookups skip the CSS selector engine; 'a b' matches '.a.b'
+    const byClass = (root, names) => (root && root.getElementsByClassName(names)[0]) || null;
+    const byTag = (root, tag) => (root && root.getElementsByTagName(tag)[0]) || null;
+    const firstOf = (root, ...names) => names.reduce((found, name) => found || byClass(root, name), null);
+    // textContent reads the DOM without forcing a layout, unlike innerText
+    const textOf = el => (el ? el.textContent.replace(RX_WS, ' ').trim() : '');
+
+    // Per-runner elements, resolved once per runner
+    const runnerFields = item => {
+        const rank = byClass(item, 'rank');
+        const shoes = byClass(item, 'shoes more');
+        return {
+            position: byTag(byClass(item, 'position'), 'span'),
+            number: byClass(rank, 'number') || byTag(rank, 'span'),
+            horse: firstOf(item, 'horse-name', 'info-horse'),
+            jockey: firstOf(item, 'jockey-name', 'info-jockey'),
+            age: byClass(item, 'age more'),
+            equipment: byClass(shoes, 'icon-shoes') || byTag(shoes, 'span'),
+            weight: firstOf(item, 'weight more', 'poids more'),
+            trainer: byClass(item, 'trainer more'),
+            distance: byClass(item, 'distance more'),
+            musique: firstOf(item, 'musique more', 'info-musique'),
+            prices: byClass(item, 'prices'),
+            reduction: byTag(byClass(item, 'reduction more'), 'span'),
+            time: byTag(byClass(item, 'time'), 'span'),
+        };
+    };
+
+    // Race title block
+    let title = textOf(document.querySelector('.race-head-title.ui-mainview-block')) || "race_data";
+
+    // Meta info block (date, track, etc.)
+    let meta = textOf(document.querySelector('.race-meta.ui-mainview-block')) || "No meta found";
+
+    // Track name
+    let track = textOf(document.querySelector('.ui-left')) || "Track not found";
+
+    // race_id is the URL slug, parsed Python-side; fall back to title and track
+    let race_id = raceSlug || '';
+    if (!race_id) {
+        const titlePart = title.replace(RX_NON_ALNUM, '').substring(0, 20);
+        const trackPart = track.replace(RX_NON_ALNUM, '');
+        race_id = `${titlePart}_${trackPart}`.toLowerCase();
+    }
+    
+    // Runners keyed by horse name, so duplicates are dropped as they are found
+    const byName = new Map();
+    const addRunner = runner => {
+        if (runner.horse_name && !byName.has(runner.horse_name)) byName.set(runner.horse_name, runner);
+    };
+    
+    // One pass over the runners lists: set the bottom (DNF) list aside and find
+    // the list whose legend has the most columns, which is the detailed table
+    const mainLists = [];
+    let bottomList = null;
+    let bestList = null;
+    let maxColumns = 0;
+
+    for (const list of document.querySelectorAll('ul.runners-list')) {
+        if (list.classList.contains('bottom-list')) {
+            bottomList = bottomList || list;
+        } else {
+            mainLists.push(list);
+        }
+        const legendItem = list.querySelector('li.legend');
+        if (legendItem) {
+            const columnCount = legendItem.querySelectorAll('div, span').length;
+            if (columnCount > maxColumns) {
+                maxColumns = columnCount;
+                bestList = list;
+            }
+        }
+    }
+
+    // Method 1: Parse structured runner list - prioritize the detailed table
+    const runnerItems = bestList
+        ? bestList.querySelectorAll('li.runner-item')
+        : mainLists.flatMap(list => [...list.querySelectorAll('li.runner-item')]);
+    
+    // Collect race results data - pre-race pages have no finishing positions, so skip the pass
+    const hasResults = !!document.querySelector('li.runner-item .position span');
+    const resultsData = {};
+    const resultsTables = hasResults ? mainLists.filter(list => !list.querySelector('.betrunners-legend')) : [];
+    
+    resultsTables.forEach(table => {
+        const resultItems = table.querySelectorAll('li.runner-item');
+        resultItems.forEach(item => {
+            const numberEl = byTag(byClass(item, 'rank'), 'span');
+            const placeEl = byTag(byClass(item, 'position'), 'span');
+            const timeEl = byTag(byClass(item, 'time'), 'span');
+            const reductionEl = byTag(byClass(item, 'reduction more'), 'span');
+            
+            if (numberEl) {
+                const number = textOf(numberEl);
+                resultsData[number] = {
+                    place: placeEl ? textOf(placeEl) : '',
+                    times: ''
+                };
+                
+                const reductionText = textOf(reductionEl);
+                const timeText = textOf(timeEl);
+                if (reductionText && reductionText !== '-') {
+                    resultsData[number].times = reductionText;
+                }
+                if (timeText && timeText !== '-') {
+                    if (resultsData[number].times) {
+                        resultsData[number].times += ' / ' + timeText;
+                    } else {
+                        resultsData[number].times = timeText;
+                    }
+                }
+            }
+        });
+    });
+    
+    // Check bottom-list for DNF runners
+    if (hasResults && bottomList) {
+        const bottomItems = bottomList.querySelectorAll('li.runner-item');
+        bottomItems.forEach(item => {
+            const numberEl = byTag(byClass(item, 'rank'), 'span');
+            const positionEl = byClass(item, 'position');
+            const placeEl = byTag(positionEl, 'span') || byTag(positionEl, 'small');
+            
+            if (numberEl) {
+                const number = textOf(numberEl);
+                resultsData[number] = {
+                    place: placeEl ? textOf(placeEl) : '-',
+                    times: '-'
+                };
+            }
+        });
+    }
+    
+    runnerItems.forEach((item, index) => {
+        // Race-level fields (race_id, title, meta, track) live in race_info only
+        let runner = {
+            place: '',
+            number: '',
+            horse_name: '',
+            jockey: '',
+            age_sex: '',
+            equipment: '',
+            weight: '',
+            times: '',
+            odds_morning: '',
+            odds_live: '',
+            trainer: '',
+            distance: '',
+            musique: '',
+            additional_info: ''
+        };
+        
+        const els = runnerFields(item);
+        
+        // Extract finishing place
+        const positionEl = els.position;
+        if (positionEl) {
+            const positionText = textOf(positionEl);
+            if (positionText.includes('er') || positionText.includes('e')) {
+                runner.place = positionText;
+            } else if (positionText === 'DAI') {
+                runner.place = 'DAI';
+            }
+        }
+        
+        // Extract horse number and merge with results
+        const numberEl = els.number;
+        if (numberEl) {
+            runner.number = textOf(numberEl);
+            
+            if (resultsData[runner.number]) {
+                runner.place = resultsData[runner.number].place;
+                if (!runner.times) {
+                    runner.times = resultsData[runner.number].times;
+                }
+            }
+        }
+        
+        // Extract horse name
+        const horseEl = els.horse;
+        if (horseEl) {
+            runner.horse_name = textOf(horseEl);
+        }
+        
+        // Extract jockey name
+        const jockeyEl = els.jockey;
+        if (jockeyEl) {
+            runner.jockey = textOf(jockeyEl);
+        }
+        
+        // Extract age/sex
+        const ageEl = els.age;
+        if (ageEl) {
+            runner.age_sex = textOf(ageEl);
+        }
+        
+        // Extract equipment (shoes)
+        const equipmentEl = els.equipment;
+        if (equipmentEl) {
+            const equipmentClass = equipmentEl.className;
+            if (equipmentClass.includes('FORE')) runner.equipment = 'FORE';
+            else if (equipmentClass.includes('HIND')) runner.equipment = 'HIND';
+            else if (equipmentClass.includes('BOTH')) runner.equipment = 'BOTH';
+            else runner.equipment = textOf(equipmentEl);
+        }
+        
+        // Extract weight
+        const weightEl = els.weight;
+        if (weightEl) {
+            runner.weight = textOf(weightEl);
+        }
+        
+        // Extract trainer
+        const trainerEl = els.trainer;
+        if (trainerEl) {
+            runner.trainer = textOf(trainerEl);
+        }
+        
+        // Extract distance
+        const distanceEl = els.distance;
+        if (distanceEl) {
+            runner.distance = textOf(distanceEl);
+        }
+        
+        // Extract musique (performance history)
+        const musiqueEl = els.musique;
+        if (musiqueEl) {
+            runner.musique = textOf(musiqueEl);
+        }
+        
+        // Extract odds - morning and live prices
+        const pricesContainer = els.prices;
+        if (pricesContainer) {
+            const morningPrice = pricesContainer.querySelector('.price-morning');
+            const livePrice = pricesContainer.querySelector('.price-live');
+            
+            if (morningPrice) runner.odds_morning = textOf(morningPrice);
+            if (livePrice) runner.odds_live = textOf(livePrice);
+            
+            if (!runner.odds_morning && !runner.odds_live) {
+                const anyPrice = pricesContainer.querySelector('span');
+                if (anyPrice) runner.odds_live = textOf(anyPrice);
+            }
+        }
+        
+        // Extract times for finished races
+        const reductionEl = els.reduction;
+        const timeEl = els.time;
+        
+        const reductionText = textOf(reductionEl);
+        const timeText = textOf(timeEl);
+        if (reductionText && reductionText !== '-') {
+            runner.times = reductionText;
+        }
+        if (timeText && timeText !== '-') {
+            if (runner.times) {
+                runner.times += ' / ' + timeText;
+            } else {
+                runner.times = timeText;
+            }
+        }
+        
+        // Store raw data - only when the structured selectors missed something,
+        // since innerText forces a layout and only the fallback parser reads it
+        const needFallback = !runner.horse_name || !runner.number;
+        if (needFallback) {
+            runner.additional_info = item.innerText.replace(RX_WS, ' ').trim();
+        }
+        
+        // Fallback parsing if core data missing
+        if (!runner.horse_name && runner.additional_info) {
+            const cleanText = runner.additional_info;
+            const numberMatch = cleanText.match(RX_NUMBER);
+            if (numberMatch) {
+                if (!runner.number) runner.number = numberMatch[1];
+                if (!runner.horse_name) runner.horse_name = numberMatch[2].trim();
+            }
+            
+            const ageMatch = cleanText.match(RX_AGE);
+            if (ageMatch && !runner.age_sex) {
+                runner.age_sex = ageMatch[1];
+            }
+            
+            const distanceMatch = cleanText.match(RX_DIST);
+            if (distanceMatch && !runner.distance) {
+                runner.distance = distanceMatch[1];
+            }
+            
+            const oddsMatch = cleanText.match(RX_ODDS);
+            if (oddsMatch) {
+                if (oddsMatch[2]) {
+                    if (!runner.odds_morning) runner.odds_morning = oddsMatch[1];
+                    if (!runner.odds_live) runner.odds_live = oddsMatch[2];
+                } else {
+                    if (!runner.odds_live) runner.odds_live = oddsMatch[1];
+                }
+            }
+        }
+        
+        // Only add if we have a horse name
+        if (runner.horse_name.length > 1) addRunner(runner);
+    });
+    
+    // Fallback text parsing if no structured data
+    if (byName.size === 0) {
+        const runnerLists = document.querySelectorAll('.runners-list');
+        let consolidatedText = '';
+        
+        runnerLists.forEach(runnerList => {
+            consolidatedText += runnerList.innerText + '\\n';
+        });
+        
+        const lines = consolidatedText.split(RX_NEWLINE).filter(line => line.trim());
+        
+        lines.forEach(line => {
+            const horseMatch = line.match(RX_HORSE_LINE);
+            
+            if (horseMatch) {
+                addRunner({
+                    place: '',
+                    number: '',
+                    horse_name: horseMatch[1].trim(),
+                    jockey: horseMatch[2].trim(),
+                    age_sex: '',
+                    equipment: '',
+                    weight: '',
+                    times: '',
+                    odds_morning: '',
+                    odds_live: '',
+                    trainer: '',
+                    distance: '',
+                    musique: '',
+                    additional_info: line.trim()
+                });
+            }
+        });
+    }
+
+    // Runners go back as one header plus value rows, so each key crosses the bridge once
+    const runners = Array.from(byName.values());
+    const header = runners.length ? Object.keys(runners[0]) : [];
+
+    return {
+        race_info: {
+            race_id: race_id,
+            title: title,
+            meta: meta,
+            track: track,
+            url: window.location.href
+        },
+        header: header,
+        rows: runners.map(runner => header.map(key => runner[key])),
+        scraped_at: new Date().toISOString()
+    };
+}
+"""
+
+# Installed once per context, so each race only sends a short call over CDP
+RUNNERS_INIT_SCRIPT = f"window.__extractRunners = {RUNNERS_JS};"
+
+async def load_and_extract(page, url: str) -> dict | None:
+    """Load a race page and run the runners extractor on it.
+
+    The page's context must have RUNNERS_INIT_SCRIPT installed (see add_init_script).
+    A navigation that keeps timing out is re-raised; a timed-out extraction returns None.
+    """
+    log.debug("Navigating to %s (domcontentloaded)", url)
+    await goto_with_retry(page, url)
+
+    # Wait for the runners list itself rather than for the network to go idle
+    try:
+        await page.wait_for_selector("ul.runners-list li.runner-item", timeout=15_000)
+    except PlaywrightTimeoutError:
+        log.warning("Runners list did not appear on %s, extracting anyway", url)
+
+    # First try to click on "Tableau des partants" if it exists
+    try:
+        tableau_button = page.locator("span.text:has-text('Tableau des partants')")
+        if await tableau_button.count() > 0:
+            await tableau_button.first.click(timeout=2_000)
+            await page.wait_for_selector(
+                "ul.runners-list:not(.bottom-list) li.runner-item",
+                state="attached",
+                timeout=5_000,
+            )
+    except Exception as e:
+        log.warning("Could not click 'Tableau des partants': %s", e)
+
+    log.debug("Running runners extraction JavaScript")
+
+    try:
+        race_data = unpack_runners(await page.evaluate("slug => window.__extractRunners(slug)", race_slug(url)))
+    except PlaywrightTimeoutError:
+        log.error("⏰ Timeout running runners extraction on %s", url)
+        return None
+    log.info("✔ Runners extraction returned %d runners", len(race_data.get('runners', [])))
+    return race_data
@@ -1,8 +1,9 @@
 ﻿from app.db import Session
 from app.models import Race
-from sqlmodel import select
+from sqlmodel import select, func
 
 with Session as session:
-    races = session.exec(select(Race)).all()
-    for race in races:
+    print(f"{session.exec(select(func.count(Race.id))).one()} races")
+    # Stream rows in chunks of 500 instead of loading the whole table first
+    for race in session.exec(select(Race).execution_options(yield_per=500)):
         print(race)
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+One-off migration of race_runners_log.csv to the split CSV layout.
+
+Older files repeat Title/Meta/Track on every runner row and carry an
+Additional_Info column. This rewrites the runners CSV with the current
+columns and moves the race-level fields to race_info_log.csv, one row per
+scrape (a run of consecutive rows with the same Race_ID). The old files did
+not record when a race was scraped, so Scraped_At is left empty for them.
+
+Safe to re-run: a runners CSV that already has the current header is left alone.
+Until it has been run, the scraper refuses to append to an old-format file.
+
+Run it on the machine that owns and pushes the CSV logs, with the scraper
+stopped, so the converted files go out with its next daily commit.
+
+Usage: python migrate_csv_logs.py
+"""
+
+import csv
+import os
+
+from app.scrapers.race import RACES_CSV_HEADERS, RACES_CSV_PATH, RUNNERS_CSV_HEADERS, RUNNERS_CSV_PATH
+
+RACE_COLUMNS = ['Title', 'Meta', 'Track']
+
+
+def migrate():
+    if not RUNNERS_CSV_PATH.exists():
+        print(f"{RUNNERS_CSV_PATH.name} not found, nothing to migrate")
+        return
+
+    with open(RUNNERS_CSV_PATH, newline='', encoding='utf-8') as csvfile:
+        header = next(csv.reader(csvfile), None)
+    if header == RUNNERS_CSV_HEADERS:
+        print(f"{RUNNERS_CSV_PATH.name} already has the current columns")
+        return
+
+    races_file_exists = RACES_CSV_PATH.exists()
+    tmp_path = RUNNERS_CSV_PATH.with_suffix('.csv.tmp')
+    runners = races = 0
+    last_race_id = None
+
+    with open(RUNNERS_CSV_PATH, newline='', encoding='utf-8') as src, \
+            open(tmp_path, 'w', newline='', encoding='utf-8') as runners_out, \
+            open(RACES_CSV_PATH, 'a', newline='', encoding='utf-8') as races_out:
+        reader = csv.DictReader(src)
+        runners_writer = csv.writer(runners_out)
+        races_writer = csv.writer(races_out)
+
+        runners_writer.writerow(RUNNERS_CSV_HEADERS)
+        if not races_file_exists:
+            races_writer.writerow(RACES_CSV_HEADERS)
+
+        for row in reader:
+            race_id = row.get('Race_ID', '')
+            if race_id != last_race_id:
+                races_writer.writerow((race_id, *(row.get(col, '') for col in RACE_COLUMNS), ''))
+                last_race_id = race_id
+                races += 1
+            runners_writer.writerow(tuple(row.get(col, '') for col in RUNNERS_CSV_HEADERS))
+            runners += 1
+
+    os.replace(tmp_path, RUNNERS_CSV_PATH)
+    print(f"Migrated {runners} runner rows; wrote {races} race rows to {RACES_CSV_PATH.name}")
+
+
+if __name__ == "__main__":
+    migrate()
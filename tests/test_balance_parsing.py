@@ -0,0 +1,26 @@
+import pytest
+
+from test_balance_extraction import _parse_amount, get_bankroll_from_balance
+
+@pytest.mark.parametrize("text,expected", [
+    ("145,70 €", 145.70),
+    ("145.70 €", 145.70),
+    ("1 234,56 €", 1234.56),
+    ("1\u00a0234,56\u00a0€", 1234.56),
+    ("1\u202f234,56\u00a0€", 1234.56),
+    ("1,234.56 €", 1234.56),
+    ("1.234,56 €", 1234.56),
+    ("50€", 50.0),
+    ("0,00 €", 0.0),
+    ("999,99 €", 999.99),
+])
+def test_parse_amount(text, expected):
+    assert _parse_amount(text) == pytest.approx(expected)
+
+def test_parse_amount_without_number():
+    with pytest.raises(ValueError):
+        _parse_amount("€")
+
+@pytest.mark.parametrize("balance,bankroll", [(145.70, 73), (1.0, 1), (0.0, 1)])
+def test_bankroll_is_half_the_balance_with_a_floor_of_one(balance, bankroll):
+    assert get_bankroll_from_balance(balance) == bankroll